@@ -18,6 +18,102 @@ from tkinter import ttk
 
 from calculadora.engine import CalculatorEngine
 
+# Layout do teclado: (rótulo, ação) por linha
+_BUTTONS = (
+    (("CE", "CE"), ("C", "C"), ("⌫", "BS"), ("÷", "/")),
+    (("7", "7"), ("8", "8"), ("9", "9"), ("×", "*")),
+    (("4", "4"), ("5", "5"), ("6", "6"), ("−", "-")),
+    (("1", "1"), ("2", "2"), ("3", "3"), ("+", "+")),
+    (("±", "±"), ("0", "0"), (".", "."), ("=", "=")),
+)
+
+# Mapeamento teclado -> ação da calculadora (montado uma vez, consultado a cada tecla)
+_KS_TO_ACTION = {
+    "KP_Add": "+",
+    "KP_Subtract": "-",
+    "KP_Multiply": "*",
+    "KP_Divide": "/",
+    "KP_Decimal": ".",
+    "period": ".",
+    "Return": "=",
+    "KP_Enter": "=",
+    "BackSpace": "BS",
+    "Delete": "CE",
+    "Escape": "C",
+}
+_KP_DIGITS = frozenset(f"KP_{d}" for d in "0123456789")
+_CH_TO_ACTION = {
+    "+": "+",
+    "-": "-",
+    "*": "*",
+    "/": "/",
+    ".": ".",
+    ",": ".",
+    "=": "=",
+}
+_SHORTCUTS = {
+    "s": "±",
+}
+
+# Limite visual do display principal (em caracteres)
+_DISPLAY_MAX = 18
+_ERROR_TEXTS = frozenset({"Erro", "Error"})
+
+
+def _fit_display(text: str) -> str:
+    """
+    Encurta um texto maior que _DISPLAY_MAX para caber no display.
+
+    GUI-friendly: trabalha só com strings (sem float) para evitar perda
+    de precisão/representação.
+    """
+    # Se já vier em notação científica, só corta no limite
+    if "e" in text.lower():
+        return text[:_DISPLAY_MAX]
+
+    # Heurística simples:
+    # - mantém sinal
+    # - preserva parte inteira e começa a cortar a parte decimal
+    sign = ""
+    if text.startswith("-"):
+        sign = "-"
+        text_body = text[1:]
+    else:
+        text_body = text
+
+    if "." in text_body:
+        int_part, frac_part = text_body.split(".", 1)
+        # reserva: sinal + inteiro + "." + (resto)
+        reserve = len(sign) + len(int_part) + 1
+        if reserve >= _DISPLAY_MAX:
+            # inteiro já “enche” o display -> mostra começo do inteiro
+            return (sign + int_part)[:_DISPLAY_MAX]
+        allowed_frac = _DISPLAY_MAX - reserve
+        return sign + int_part + "." + frac_part[:allowed_frac]
+
+    # número inteiro muito grande -> corta visualmente
+    return (sign + text_body)[:_DISPLAY_MAX]
+
+
+def _map_key(keysym: str, char: str) -> str | None:
+    """
+    Traduz uma tecla (keysym + char do evento Tk) para a ação da calculadora.
+    Retorna None quando a tecla não tem ação.
+    """
+    # Ordem por frequência: dígitos > teclas de caractere (. operadores =) > keysyms
+    if char.isdigit():
+        return char
+
+    action = _CH_TO_ACTION.get(char) or _KS_TO_ACTION.get(keysym)
+    if action is not None:
+        return action
+
+    if keysym in _KP_DIGITS:
+        return keysym[-1]
+
+    # Atalhos por letra (maiúscula ou minúscula)
+    return _SHORTCUTS.get(char.lower())
+
 
 class CalculatorApp:
     def __init__(self, root: tk.Tk):
@@ -26,11 +122,34 @@ class CalculatorApp:
 
         self.engine = CalculatorEngine()
 
+        # Tabela tecla -> ação (dígitos são tratados à parte em _on_press)
+        eng = self.engine
+        self._dispatch = {
+            ".": lambda _: eng.press_decimal(),
+            "+": eng.press_operator,
+            "-": eng.press_operator,
+            "*": eng.press_operator,
+            "/": eng.press_operator,
+            "=": lambda _: eng.press_equals(),
+            "C": lambda _: eng.press_clear(),
+            "CE": lambda _: eng.press_clear_entry(),
+            "BS": lambda _: eng.press_backspace(),
+            "±": lambda _: eng.press_toggle_sign(),
+        }
+
         self.var_secondary = tk.StringVar(value="")
         self.var_display = tk.StringVar(value="0")
 
+        # Últimos valores escritos nas StringVar: evita .set() (e redesenho) quando nada mudou
+        self._last_display = None
+        self._last_secondary = None
+        self._rendered_version = -1
+
         self._build_ui()
+        # Binding só na janela raiz (não bind_all): teclas dos filhos chegam pela
+        # bindtag da toplevel; o foco inicial garante teclado ativo ao abrir.
         self.root.bind("<Key>", self._on_key_event)
+        self.root.focus_set()
         self._render()
 
     def _build_ui(self):
@@ -59,146 +178,68 @@ class CalculatorApp:
         grid = ttk.Frame(wrapper)
         grid.pack(fill="both", expand=True)
 
-        for r in range(5):
-            grid.rowconfigure(r, weight=1)
-        for c in range(4):
-            grid.columnconfigure(c, weight=1)
-
-        buttons = [
-            [("CE", "CE"), ("C", "C"), ("⌫", "BS"), ("÷", "/")],
-            [("7", "7"), ("8", "8"), ("9", "9"), ("×", "*")],
-            [("4", "4"), ("5", "5"), ("6", "6"), ("−", "-")],
-            [("1", "1"), ("2", "2"), ("3", "3"), ("+", "+")],
-            [("±", "±"), ("0", "0"), (".", "."), ("=", "=")],
-        ]
-
-        for r, row in enumerate(buttons):
-            for c, (label, value) in enumerate(row):
-                btn = ttk.Button(
-                    grid,
-                    text=label,
-                    command=lambda v=value: self._on_press(v),
-                )
-                btn.grid(row=r, column=c, sticky="nsew", padx=4, pady=4)
+        # Tk aceita uma lista de índices: uma chamada por eixo em vez de uma por linha/coluna
+        grid.rowconfigure(tuple(range(len(_BUTTONS))), weight=1)
+        grid.columnconfigure(tuple(range(len(_BUTTONS[0]))), weight=1)
+
+        # Um único comando Tcl compartilhado por todos os botões; a ação vai como argumento
+        press_cmd = self.root.register(self._on_press)
+
+        for r, row in enumerate(_BUTTONS):
+            btns = [
+                ttk.Button(grid, text=label, command=f"{press_cmd} {{{value}}}")
+                for label, value in row
+            ]
+            # Um único "grid" por linha: os botões ocupam as colunas 0..n em sequência
+            grid.tk.call(
+                "grid", *map(str, btns), "-row", r, "-sticky", "nsew", "-padx", 4, "-pady", 4
+            )
 
     def _on_press(self, value: str):
         if value.isdigit():
             self.engine.press_digit(value)
-        elif value == ".":
-            self.engine.press_decimal()
-        elif value in {"+", "-", "*", "/"}:
-            self.engine.press_operator(value)
-        elif value == "=":
-            self.engine.press_equals()
-        elif value == "C":
-            self.engine.press_clear()
-        elif value == "CE":
-            self.engine.press_clear_entry()
-        elif value == "BS":
-            self.engine.press_backspace()
-        elif value == "±":
-            self.engine.press_toggle_sign()
+        else:
+            action = self._dispatch.get(value)
+            if action is not None:
+                action(value)
 
         self._render()
 
     def _render(self):
-        raw = self.engine.get_display()
-
-        # GUI-friendly: limita o tamanho visual do display sem usar float
-        # para evitar perda de precisão/representação.
-        text = raw
-
-        MAX = 18  # limite visual
-        if text not in {"Erro", "Error"} and len(text) > MAX:
-            # Se já vier em notação científica, só corta no limite
-            if "e" in text.lower():
-                text = text[:MAX]
-            else:
-                # Heurística simples:
-                # - mantém sinal
-                # - preserva parte inteira e começa a cortar a parte decimal
-                sign = ""
-                if text.startswith("-"):
-                    sign = "-"
-                    text_body = text[1:]
-                else:
-                    text_body = text
-
-                if "." in text_body:
-                    int_part, frac_part = text_body.split(".", 1)
-                    # reserva: sinal + inteiro + "." + (resto)
-                    reserve = len(sign) + len(int_part) + 1
-                    if reserve >= MAX:
-                        # inteiro já “enche” o display -> mostra começo do inteiro
-                        text = (sign + int_part)[:MAX]
-                    else:
-                        allowed_frac = MAX - reserve
-                        text = sign + int_part + "." + frac_part[:allowed_frac]
-                else:
-                    # número inteiro muito grande -> corta visualmente
-                    text = (sign + text_body)[:MAX]
-
-        self.var_display.set(text)
-        self.var_secondary.set(self.engine.get_secondary())
-
-    def _on_key_event(self, event: tk.Event):
-        ks = event.keysym
-        ch = event.char
-
-        if ch.isdigit():
-            self._on_press(ch)
+        # Engine não mudou desde o último desenho -> nada a fazer
+        version = self.engine.version
+        if version == self._rendered_version:
             return
+        self._rendered_version = version
 
-        if ks.startswith("KP_") and len(ks) == 4 and ks[-1].isdigit():
-            self._on_press(ks[-1])
-            return
+        raw, secondary = self.engine.snapshot()
 
-        if ch in {"+", "-", "*", "/"}:
-            self._on_press(ch)
-            return
+        # Caminho comum: texto curto (ou mensagem de erro) vai direto para o display
+        if len(raw) <= _DISPLAY_MAX or raw in _ERROR_TEXTS:
+            text = raw
+        else:
+            text = _fit_display(raw)
 
-        if ks == "KP_Add":
-            self._on_press("+")
-            return
-        if ks == "KP_Subtract":
-            self._on_press("-")
-            return
-        if ks == "KP_Multiply":
-            self._on_press("*")
-            return
-        if ks == "KP_Divide":
-            self._on_press("/")
-            return
-
-        if ch in {".", ","} or ks in {"period", "KP_Decimal"}:
-            self._on_press(".")
-            return
-
-        if ks in {"Return", "KP_Enter"} or ch == "=":
-            self._on_press("=")
-            return
-
-        if ks == "BackSpace":
-            self._on_press("BS")
-            return
-        if ks == "Delete":
-            self._on_press("CE")
-            return
-
-        if ks == "Escape":
-            self._on_press("C")
-            return
+        # Só escreve nas StringVar quando o valor mudou (cada .set() dispara traces + relayout)
+        if text != self._last_display:
+            self.var_display.set(text)
+            self._last_display = text
+        if secondary != self._last_secondary:
+            self.var_secondary.set(secondary)
+            self._last_secondary = secondary
 
-        if ch.lower() == "s":
-            self._on_press("±")
-            return
+    def _on_key_event(self, event: tk.Event):
+        action = _map_key(event.keysym, event.char)
+        if action is not None:
+            self._on_press(action)
 
 
 def main() -> None:
     root = tk.Tk()
     try:
         style = ttk.Style(root)
-        if "vista" in style.theme_names():
+        # Só troca de tema se ainda não estiver em "vista" (evita round-trips ao Tcl)
+        if style.theme_use() != "vista" and "vista" in style.theme_names():
             style.theme_use("vista")
     except Exception:
         pass
@@ -1,4 +1,56 @@
-from decimal import Decimal, InvalidOperation, ROUND_HALF_UP, getcontext
+from decimal import Context, Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+
+# Contexto das operações da calculadora (precisão 28, arredondamento padrão do Decimal).
+# Passado explicitamente: não depende nem altera o contexto global da thread.
+_CTX = Context(prec=28)
+
+_DIGITS = frozenset("0123456789")
+
+# Constante Decimal reaproveitada (sem reparse de string)
+_ZERO = Decimal(0)
+
+# Textos de entrada que ainda não formam um número (valem zero)
+_EMPTY_ENTRIES = frozenset({"", "-", ".", "-."})
+
+# Operadores aceitos (internos e visuais) e conversões entre as duas formas
+_VALID_OPS = frozenset({"+", "-", "*", "×", "/", "÷"})
+_OP_NORMALIZE = {"×": "*", "÷": "/"}
+_OP_DISPLAY = {"+": "+", "-": "−", "*": "×", "/": "÷"}
+
+# Operador interno -> operação Decimal (sempre no contexto _CTX)
+_OPS = {"+": _CTX.add, "-": _CTX.subtract, "*": _CTX.multiply, "/": _CTX.divide}
+
+
+@lru_cache(maxsize=256)
+def _parse_decimal(t: str) -> Decimal:
+    """
+    Converte o texto do display (já normalizado pela própria engine) para Decimal.
+    - Aceita "0", "-0", "12", "-12", "0.", "-0.", "12.", "12.34"
+    - Memoizado: displays pequenos se repetem muito e Decimal é imutável.
+    """
+    if len(t) <= 2 and t in _EMPTY_ENTRIES:
+        return _ZERO
+
+    # Se terminar com '.', remove para converter
+    if t.endswith("."):
+        t = t[:-1]
+        if t in ("", "-"):
+            return _ZERO
+
+    return Decimal(t)
+
+
+class _DisplayOverflow(ArithmeticError):
+    """Valor não cabe no display (nem a parte inteira); vira o erro "Overflow"."""
+
+
+def _trim_fraction(s: str) -> str:
+    """Remove zeros à direita da fração (e o ponto, se sobrar): "1.50" -> "1.5", "2.00" -> "2"."""
+    if "." not in s:
+        return s
+    s = s.rstrip("0")
+    return s[:-1] if s[-1] == "." else s
 
 
 class CalculatorEngine:
@@ -8,12 +60,30 @@ class CalculatorEngine:
     - Usa Decimal para precisão.
     """
 
+    # Layout fixo de atributos: acesso mais rápido e objeto menor que com __dict__
+    __slots__ = (
+        "version",
+        "display_text",
+        "_secondary_text",
+        "_secondary_parts",
+        "stored_value",
+        "pending_op",
+        "reset_next_digit",
+        "error_state",
+        "last_op",
+        "last_rhs",
+    )
+
     # Limite visual do display (proteção de UX + evita números absurdos no display)
     MAX_DISPLAY_LEN = 32
 
+    # Passos de quantize: _POW10_NEG[k - 1] == 10**-k (0.1, 0.01, ...), k < MAX_DISPLAY_LEN
+    _POW10_NEG = tuple(Decimal(1).scaleb(-k) for k in range(1, MAX_DISPLAY_LEN))
+
     def __init__(self):
-        # Precisão padrão do Decimal (global do contexto)
-        getcontext().prec = 28
+        # Versão do estado: incrementa a cada tecla que altera a engine.
+        # A GUI compara com a última versão desenhada para pular renders redundantes.
+        self.version = 0
         self.reset()
 
     # -------------------------
@@ -21,6 +91,7 @@ class CalculatorEngine:
     # -------------------------
     def reset(self):
         self.display_text = "0"
+        self._secondary_parts = None  # (valor, op, texto) p/ montar o secundário sob demanda
         self.display_secondary = ""
 
         self.stored_value = None  # Decimal | None
@@ -34,12 +105,33 @@ class CalculatorEngine:
         self.last_op = None  # str | None
         self.last_rhs = None  # Decimal | None (último operando à direita)
 
+    @property
+    def display_secondary(self) -> str:
+        """Display secundário (ex.: "10 +"), montado sob demanda após press_operator."""
+        if self._secondary_text is None:
+            parts = self._secondary_parts
+            if parts is None:
+                return ""
+            value, op, formatted = parts
+            if formatted is None:
+                formatted = self._format_decimal(value)
+            self._secondary_text = formatted + " " + self._op_for_display(op)
+        return self._secondary_text
+
+    @display_secondary.setter
+    def display_secondary(self, text: str):
+        self._secondary_text = text
+
     def get_display(self) -> str:
         return self.display_text
 
     def get_secondary(self) -> str:
         return self.display_secondary
 
+    def snapshot(self) -> tuple[str, str]:
+        """Retorna (display principal, display secundário) numa única chamada."""
+        return self.display_text, self.display_secondary
+
     # -------------------------
     # Helpers
     # -------------------------
@@ -64,34 +156,10 @@ class CalculatorEngine:
         """Sai do erro e reseta completamente."""
         self.reset()
 
-    def _to_decimal(self, text: str) -> Decimal:
-        """
-        Converte o texto do display para Decimal.
-        - Aceita "0", "-0", "12", "-12", "0.", "-0.", "12.", "12.34"
-        - Converte vírgula para ponto por segurança.
-        """
-        t = str(text).strip().replace(",", ".")
-
-        if t in ("", "-", ".", "-."):
-            return Decimal("0")
-
-        # Se terminar com '.', remove para converter
-        if t.endswith("."):
-            t = t[:-1]
-            if t in ("", "-"):
-                return Decimal("0")
-
-        return Decimal(t)
-
     @staticmethod
     def _op_for_display(op: str) -> str:
         """Converte operador interno para símbolo bonito (apenas UX)."""
-        return {
-            "+": "+",
-            "-": "−",
-            "*": "×",
-            "/": "÷",
-        }.get(op, op)
+        return _OP_DISPLAY.get(op, op)
 
     def _format_decimal(self, value: Decimal) -> str:
         """Formata Decimal para o display principal.
@@ -100,7 +168,7 @@ class CalculatorEngine:
         - Evita notação científica (sempre em forma fixa quando possível)
         - Remove zeros desnecessários à direita
         - Se exceder MAX_DISPLAY_LEN por causa da parte decimal, tenta arredondar para caber
-        - Se nem a parte inteira couber, marca Overflow
+        - Se nem a parte inteira couber, levanta _DisplayOverflow (o chamador entra em erro)
         """
 
         # Evita aparecer "-0" no display.
@@ -108,71 +176,54 @@ class CalculatorEngine:
             return "0"
 
         # Primeiro tenta forma fixa normal (sem notação científica)
-        s = format(value, "f")
-        if "." in s:
-            s = s.rstrip("0").rstrip(".")
+        s = _trim_fraction(format(value, "f"))
 
         # Se já couber, ótimo
         if len(s) <= self.MAX_DISPLAY_LEN:
             return s
 
-        # Se existe parte decimal e estourou, tentamos arredondar as casas decimais para caber
+        # Se existe parte decimal e estourou, arredondamos as casas decimais para caber.
+        # A largura da parte inteira vem direto do expoente (adjusted), então basta
+        # um único quantize: o resultado ocupa exatamente MAX_DISPLAY_LEN caracteres
+        # (ou menos, se o arredondamento zerar a fração).
         if "." in s:
-            for _ in range(6):
-                sign = "-" if value < 0 else ""
-                abs_fixed = format(abs(value), "f")
-                int_part = abs_fixed.split(".", 1)[0]
-
-                # Se nem o inteiro cabe, não há o que fazer
-                if len(sign) + len(int_part) > self.MAX_DISPLAY_LEN:
-                    self._set_error("Overflow")
-                    return self.display_text
-
-                # Espaço máximo para a fração (considerando o ponto)
-                allowed_frac = self.MAX_DISPLAY_LEN - len(sign) - len(int_part) - 1
-                if allowed_frac <= 0:
-                    # Sem espaço para fração -> mostra apenas o inteiro
-                    return sign + int_part
+            sign = "-" if value < 0 else ""
+            int_digits = max(value.adjusted() + 1, 1)
 
-                # Ex.: allowed_frac=3 -> quant = 0.001
-                quant = Decimal("1").scaleb(-allowed_frac)
+            # Se nem o inteiro cabe, não há o que fazer
+            if len(sign) + int_digits > self.MAX_DISPLAY_LEN:
+                raise _DisplayOverflow
 
-                try:
-                    value = value.quantize(quant, rounding=ROUND_HALF_UP)
-                except (InvalidOperation, ValueError):
-                    self._set_error("Overflow")
-                    return self.display_text
+            # Espaço máximo para a fração (considerando o ponto)
+            allowed_frac = self.MAX_DISPLAY_LEN - len(sign) - int_digits - 1
+            if allowed_frac <= 0:
+                # Sem espaço para fração -> mostra apenas o inteiro
+                return s.split(".", 1)[0]
 
-                s = format(value, "f")
-                if "." in s:
-                    s = s.rstrip("0").rstrip(".")
+            # Ex.: allowed_frac=3 -> quant = 0.001
+            quant = self._POW10_NEG[allowed_frac - 1]
 
-                if len(s) <= self.MAX_DISPLAY_LEN:
-                    return s
+            try:
+                value = value.quantize(quant, rounding=ROUND_HALF_UP, context=_CTX)
+            except (InvalidOperation, ValueError):
+                raise _DisplayOverflow from None
 
-            self._set_error("Overflow")
-            return self.display_text
+            return _trim_fraction(format(value, "f"))
 
         # Caso extremo: sem ponto e não coube -> overflow real (inteiro grande demais)
-        self._set_error("Overflow")
-        return self.display_text
+        raise _DisplayOverflow
 
     def _apply_op(self, a: Decimal, op: str, b: Decimal) -> Decimal:
         """
         Aplica operação com Decimal.
         Pode levantar ZeroDivisionError (tratado pelo chamador).
         """
-        if op == "+":
-            return a + b
-        if op == "-":
-            return a - b
-        if op in ("*", "×"):
-            return a * b
-        if op in ("/", "÷"):
-            if b == 0:
-                raise ZeroDivisionError
-            return a / b
-        raise ValueError(f"Operador inválido: {op}")
+        fn = _OPS.get(op)
+        if fn is None:
+            raise ValueError(f"Operador inválido: {op}")
+        if op == "/" and b == 0:
+            raise ZeroDivisionError
+        return fn(a, b)
 
     def _clear_repeat_memory_if_free(self):
         """
@@ -185,48 +236,78 @@ class CalculatorEngine:
             self.last_op = None
             self.last_rhs = None
 
-    def _start_new_entry_if_needed(self):
+    def _prepare_entry(self, editing: bool = False):
         """
-        Quando reset_next_digit está True, significa que a próxima entrada numérica
-        deve começar do zero (ex.: depois de apertar operador ou '=')
+        Prepara o display para receber entrada numérica (numa única chamada por tecla).
+        - Se reset_next_digit está True, a próxima entrada começa do zero
+          (ex.: depois de apertar operador ou '=').
+        - Começando uma nova entrada, ou editando a atual (editing=True: backspace, ±),
+          desarma repeat-equals se a operação anterior já terminou (UX previsível).
         """
         if self.reset_next_digit:
             self.display_text = "0"
             self.reset_next_digit = False
+        elif not editing:
+            return
 
-            # Começando uma nova entrada, desarma repeat-equals (UX previsível).
-            self._clear_repeat_memory_if_free()
+        if self.pending_op is None and self.stored_value is None:
+            self.last_op = None
+            self.last_rhs = None
+
+    def _entry_full(self) -> bool:
+        """True se a entrada atual já está no limite do display (sem nova entrada ou erro pendente)."""
+        return len(self.display_text) >= self.MAX_DISPLAY_LEN and not (
+            self.reset_next_digit or self.error_state
+        )
 
     # -------------------------
     # Teclas (inputs)
     # -------------------------
     def press_digit(self, d: str):
         """Digite 0-9."""
-        if not (isinstance(d, str) and len(d) == 1 and d.isdigit()):
+        if type(d) is not str or d not in _DIGITS:
+            return
+
+        # UX: se já atingiu o limite, ignora o novo dígito (não entra em erro).
+        # Checado antes de tudo: com erro ou nova entrada pendente o display volta a "0",
+        # então só chega aqui no limite quem está segurando a tecla sobre a entrada atual.
+        if self._entry_full():
             return
 
+        self.version += 1
+
         if self.error_state:
             self._clear_error_full()
 
-        self._start_new_entry_if_needed()
-
-        # UX: se já atingiu o limite, ignora o novo dígito (não entra em erro)
-        if self.display_text != "0" and len(self.display_text) >= self.MAX_DISPLAY_LEN:
-            return
+        self._prepare_entry()
 
-        if self.display_text == "0":
-            self.display_text = d
-        elif self.display_text == "-0":
-            self.display_text = "-" + d
+        text = self.display_text
+        if text == "0":
+            text = d
+        elif text == "-0":
+            text = "-" + d
         else:
-            self.display_text += d
+            text += d
+        self.display_text = text
+
+    def press_digits(self, digits: str):
+        """
+        Digita vários dígitos de uma vez (mesmo efeito de press_digit para cada um).
+        Para assim que o display atinge o limite: os dígitos restantes seriam ignorados.
+        """
+        for d in digits:
+            if self._entry_full():
+                return
+            self.press_digit(d)
 
     def press_decimal(self):
         """Insere ponto decimal."""
+        self.version += 1
+
         if self.error_state:
             self._clear_error_full()
 
-        self._start_new_entry_if_needed()
+        self._prepare_entry()
 
         if "." in self.display_text:
             return
@@ -241,10 +322,10 @@ class CalculatorEngine:
         if self.error_state:
             return
 
-        # Editar entrada após uma operação concluída também desarma repeat-equals.
-        self._clear_repeat_memory_if_free()
+        self.version += 1
 
-        self._start_new_entry_if_needed()
+        # Editar entrada após uma operação concluída também desarma repeat-equals.
+        self._prepare_entry(editing=True)
 
         if self.display_text == "0":
             return
@@ -259,13 +340,13 @@ class CalculatorEngine:
 
     def press_toggle_sign(self):
         """Troca sinal (±)."""
+        self.version += 1
+
         if self.error_state:
             self._clear_error_full()
 
         # Editar entrada após uma operação concluída também desarma repeat-equals.
-        self._clear_repeat_memory_if_free()
-
-        self._start_new_entry_if_needed()
+        self._prepare_entry(editing=True)
 
         if self.display_text == "0":
             return
@@ -279,10 +360,13 @@ class CalculatorEngine:
 
     def press_clear(self):
         """C: reseta tudo."""
+        self.version += 1
         self.reset()
 
     def press_clear_entry(self):
         """CE: limpa só a entrada atual."""
+        self.version += 1
+
         if self.error_state:
             self._clear_error_full()
             return
@@ -303,39 +387,44 @@ class CalculatorEngine:
             return
 
         op = op.strip()
-        if op not in {"+", "-", "*", "×", "/", "÷"}:
+        if op not in _VALID_OPS:
             return
 
+        self.version += 1
+
         # Normaliza entrada visual para operador interno
-        if op == "×":
-            op = "*"
-        if op == "÷":
-            op = "/"
+        op = _OP_NORMALIZE.get(op, op)
 
-        current = self._to_decimal(self.display_text)
+        current = _parse_decimal(self.display_text)
+
+        # Texto já formatado de stored_value, quando disponível (encadeamento)
+        formatted = None
 
         # Encadeamento (ex.: 10 + 2 + ... calcula antes de trocar o operador)
         if self.pending_op is not None and self.stored_value is not None and not self.reset_next_digit:
             try:
                 result = self._apply_op(self.stored_value, self.pending_op, current)
+                text = self._format_decimal(result)
             except ZeroDivisionError:
                 self._set_error("Erro")
                 return
+            except _DisplayOverflow:
+                self._set_error("Overflow")
+                return
 
             self.stored_value = result
-            self.display_text = self._format_decimal(result)
-            if self.error_state:
-                return
+            self.display_text = formatted = text
 
         if self.stored_value is None:
             self.stored_value = current
 
         self.pending_op = op
 
-        # Display secundário com símbolos bonitos (× ÷ −)
-        self.display_secondary = f"{self._format_decimal(self.stored_value)} {self._op_for_display(op)}"
-        if self.error_state:
-            return
+        # Display secundário com símbolos bonitos (× ÷ −), formatado só quando for lido.
+        # stored_value sempre cabe no display aqui (é a entrada digitada ou um resultado
+        # que acabou de ser formatado), então a formatação adiada não entra em Overflow.
+        self._secondary_parts = (self.stored_value, op, formatted)
+        self._secondary_text = None
 
         self.reset_next_digit = True
 
@@ -351,9 +440,15 @@ class CalculatorEngine:
         if self.error_state:
             return
 
+        if self.pending_op is None and self.last_op is None:
+            # Caso 3 (abaixo): nada a fazer, estado não muda.
+            return
+
+        self.version += 1
+
         # Caso 1: existe uma operação pendente -> calcula e ARMAZENA para repetir.
         if self.pending_op is not None and self.stored_value is not None:
-            current = self._to_decimal(self.display_text)
+            current = _parse_decimal(self.display_text)
 
             # "=" logo após operador: usa stored_value como segundo operando (5 + = -> 10)
             if self.reset_next_digit:
@@ -361,11 +456,14 @@ class CalculatorEngine:
 
             try:
                 result = self._apply_op(self.stored_value, self.pending_op, current)
+                self.display_text = self._format_decimal(result)
             except ZeroDivisionError:
                 self._set_error("Erro")
                 return
+            except _DisplayOverflow:
+                self._set_error("Overflow")
+                return
 
-            self.display_text = self._format_decimal(result)
             self.display_secondary = ""
 
             # ✅ Guarda para "=" repetido
@@ -380,14 +478,17 @@ class CalculatorEngine:
 
         # Caso 2: sem operação pendente, mas existe memória de repetição -> repete.
         if self.last_op is not None and self.last_rhs is not None:
-            a = self._to_decimal(self.display_text)
+            a = _parse_decimal(self.display_text)
             try:
                 result = self._apply_op(a, self.last_op, self.last_rhs)
+                self.display_text = self._format_decimal(result)
             except ZeroDivisionError:
                 self._set_error("Erro")
                 return
+            except _DisplayOverflow:
+                self._set_error("Overflow")
+                return
 
-            self.display_text = self._format_decimal(result)
             self.display_secondary = ""
             self.reset_next_digit = True
             return
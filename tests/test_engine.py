@@ -19,262 +19,309 @@ Como rodar (na raiz do projeto):
 
 from __future__ import annotations
 
+import re
+from collections.abc import Callable
+from decimal import localcontext
+from functools import lru_cache, partial
+
+import pytest
+
 from calculadora.engine import CalculatorEngine
 
 
 # ----------------------------
 # Helpers para manter os testes legíveis
 # ----------------------------
-def press(engine: CalculatorEngine, key: str) -> None:
-    """Simula UMA tecla/ação na calculadora."""
-    if key.isdigit() and len(key) == 1:
-        engine.press_digit(key)
-        return
-
-    if key == ".":
-        engine.press_decimal()
-        return
-
-    if key in {"+", "-", "*", "/", "×", "÷"}:
-        engine.press_operator(key)
-        return
+# Grupos de teclas aceitas (aliases levam à mesma ação)
+_OPERATOR_KEYS = frozenset({"+", "-", "*", "/", "×", "÷"})
+_BACKSPACE_KEYS = frozenset({"BS", "BACK", "BACKSPACE"})
+_SIGN_KEYS = frozenset({"±", "SIGN"})
+
+# Tecla -> handler (recebe a engine). Montado uma vez; press() vira uma consulta.
+_KEY_HANDLERS: dict[str, Callable[[CalculatorEngine], None]] = {
+    **{d: partial(CalculatorEngine.press_digit, d=d) for d in "0123456789"},
+    **{op: partial(CalculatorEngine.press_operator, op=op) for op in _OPERATOR_KEYS},
+    **dict.fromkeys(_BACKSPACE_KEYS, CalculatorEngine.press_backspace),
+    **dict.fromkeys(_SIGN_KEYS, CalculatorEngine.press_toggle_sign),
+    ".": CalculatorEngine.press_decimal,
+    "=": CalculatorEngine.press_equals,
+    "C": CalculatorEngine.press_clear,
+    "CE": CalculatorEngine.press_clear_entry,
+}
 
-    if key == "=":
-        engine.press_equals()
-        return
 
-    if key == "C":
-        engine.press_clear()
-        return
-
-    if key == "CE":
-        engine.press_clear_entry()
-        return
-
-    if key in {"BS", "BACK", "BACKSPACE"}:
-        engine.press_backspace()
-        return
-
-    if key in {"±", "SIGN"}:
-        engine.press_toggle_sign()
-        return
-
-    raise ValueError(f"Tecla não suportada: {key!r}")
+def press(engine: CalculatorEngine, key: str) -> None:
+    """Simula UMA tecla/ação na calculadora."""
+    try:
+        handler = _KEY_HANDLERS[key]
+    except KeyError:
+        raise ValueError(f"Tecla não suportada: {key!r}") from None
+    handler(engine)
+
+
+# Tokens de uma sequência compacta ("12+7 CE 5="): teclas de várias letras primeiro;
+# espaços só separam; qualquer outro caractere vira token e falha como tecla não suportada.
+_KEY_TOKEN = re.compile(r"CE|BACKSPACE|BACK|BS|SIGN|\S")
+
+
+@lru_cache(maxsize=None)
+def _compile(seq: str | tuple[str, ...]) -> tuple[Callable[[CalculatorEngine], None], ...]:
+    """Resolve uma sequência de teclas para handlers (uma vez por sequência distinta)."""
+    keys = _KEY_TOKEN.findall(seq) if isinstance(seq, str) else seq
+    handlers = []
+    for key in keys:
+        try:
+            handlers.append(_KEY_HANDLERS[key])
+        except KeyError:
+            raise ValueError(f"Tecla não suportada: {key!r}") from None
+    return tuple(handlers)
+
+
+def press_seq(engine: CalculatorEngine, seq: str | list[str]) -> None:
+    """
+    Pressiona uma sequência de teclas.
+    Aceita string compacta ("10+2=", "12+7 CE 5=") ou lista de teclas (["1", "0", "+"]).
+    """
+    for handler in _compile(seq if isinstance(seq, str) else tuple(seq)):
+        handler(engine)
+
+
+@pytest.fixture
+def eng() -> CalculatorEngine:
+    """Engine nova, recém-construída, para cada teste."""
+    return CalculatorEngine()
 
 
-def press_seq(engine: CalculatorEngine, seq: list[str]) -> None:
-    """Pressiona uma sequência de teclas."""
-    for k in seq:
-        press(engine, k)
+@pytest.fixture
+def eng_in_error(eng: CalculatorEngine) -> CalculatorEngine:
+    """Engine em estado de erro (9 / 0 =)."""
+    press_seq(eng, "9/0=")
+    return eng
 
 
-def new_engine() -> CalculatorEngine:
-    """Cria uma engine nova, garantindo estado inicial limpo."""
-    return CalculatorEngine()
+@pytest.fixture
+def eng_after_5_plus_2(eng: CalculatorEngine) -> CalculatorEngine:
+    """Engine logo após 5 + 2 = (display 7, repeat-equals armado)."""
+    press_seq(eng, "5+2=")
+    return eng
 
 
 # ----------------------------
 # Testes
 # ----------------------------
-def test_initial_state():
-    eng = new_engine()
-    assert eng.get_display() == "0"
-    assert eng.get_secondary() == ""
-
+def test_initial_state(eng):
+    assert eng.snapshot() == ("0", "")
 
-def test_digit_entry_leading_zero_rules():
-    eng = new_engine()
 
-    press_seq(eng, ["0", "0", "0"])
+def test_digit_entry_leading_zero_rules(eng):
+    press_seq(eng, "000")
     assert eng.get_display() == "0"
 
-    press_seq(eng, ["1", "2", "3"])
+    press_seq(eng, "123")
     assert eng.get_display() == "123"
 
 
-def test_decimal_entry_basic():
-    eng = new_engine()
-
-    press_seq(eng, ["0", ".", "5"])
+def test_decimal_entry_basic(eng):
+    press_seq(eng, "0.5")
     assert eng.get_display() == "0.5"
 
-    press_seq(eng, ["C", "1", ".", "2"])
+    press_seq(eng, "C 1.2")
     assert eng.get_display() == "1.2"
 
 
-def test_ignore_double_decimal():
-    eng = new_engine()
-
-    press_seq(eng, ["1", ".", "2", ".", "3"])
+def test_ignore_double_decimal(eng):
+    press_seq(eng, "1.2.3")
     assert eng.get_display() == "1.23"
 
 
-def test_backspace_behavior():
-    eng = new_engine()
-
-    press_seq(eng, ["1", "2", "3", "BS"])
+def test_backspace_behavior(eng):
+    press_seq(eng, "123 BS")
     assert eng.get_display() == "12"
 
-    press_seq(eng, ["BS"])
+    press_seq(eng, "BS")
     assert eng.get_display() == "1"
 
-    press_seq(eng, ["BS"])
+    press_seq(eng, "BS")
     assert eng.get_display() == "0"
 
     # backspace em 0 não muda
-    press_seq(eng, ["BS"])
+    press_seq(eng, "BS")
     assert eng.get_display() == "0"
 
 
-def test_toggle_sign_behavior():
-    eng = new_engine()
-
-    press_seq(eng, ["9", "±"])
+def test_toggle_sign_behavior(eng):
+    press_seq(eng, "9±")
     assert eng.get_display() == "-9"
 
-    press_seq(eng, ["±"])
+    press_seq(eng, "±")
     assert eng.get_display() == "9"
 
     # em zero, não deve virar "-0"
-    press_seq(eng, ["C", "0", "±"])
+    press_seq(eng, "C 0±")
     assert eng.get_display() == "0"
 
 
-def test_clear_c_resets_everything():
-    eng = new_engine()
-
-    press_seq(eng, ["1", "2", "+"])
+def test_clear_c_resets_everything(eng):
+    press_seq(eng, "12+")
     assert eng.get_secondary() != ""
 
-    press_seq(eng, ["C"])
-    assert eng.get_display() == "0"
-    assert eng.get_secondary() == ""
-
+    press_seq(eng, "C")
+    assert eng.snapshot() == ("0", "")
 
-def test_clear_entry_ce_only_clears_current_entry():
-    eng = new_engine()
 
+def test_clear_entry_ce_only_clears_current_entry(eng):
     # 12 + 34, CE deve limpar o 34 (entrada atual), mantendo a operação pendente
-    press_seq(eng, ["1", "2", "+", "3", "4", "CE"])
+    press_seq(eng, "12+34 CE")
     assert eng.get_display() == "0"
     assert eng.get_secondary() != ""
 
 
-def test_basic_addition():
-    eng = new_engine()
+@pytest.mark.parametrize(
+    ("seq", "expected"),
+    [
+        ("10+2=", "12"),
+        ("9-5=", "4"),
+        ("6*7=", "42"),
+        ("8/2=", "4"),
+        # 10 + 2 + 3 = 15 (encadeamento avalia da esquerda para a direita)
+        ("10+2+3=", "15"),
+    ],
+    ids=["addition", "subtraction", "multiplication", "division", "chain_left_to_right"],
+)
+def test_basic_arithmetic(eng, seq, expected):
+    press_seq(eng, seq)
+    assert eng.get_display() == expected
 
-    press_seq(eng, ["1", "0", "+", "2", "="])
-    assert eng.get_display() == "12"
 
+def test_visual_operator_and_key_aliases(eng):
+    # × e ÷ chegam à engine como símbolos visuais; BACK/SIGN são aliases de BS/±
+    press_seq(eng, "6×7÷2=")
+    assert eng.get_display() == "21"
 
-def test_basic_subtraction():
-    eng = new_engine()
+    press_seq(eng, "C 12 BACK SIGN")
+    assert eng.get_display() == "-1"
 
-    press_seq(eng, ["9", "-", "5", "="])
-    assert eng.get_display() == "4"
 
+def test_equals_after_operator_uses_stored_value_as_rhs(eng):
+    # 5 + = => 10 (usa 5 como segundo operando)
+    press_seq(eng, "5+=")
+    assert eng.get_display() == "10"
 
-def test_basic_multiplication():
-    eng = new_engine()
 
-    press_seq(eng, ["6", "*", "7", "="])
-    assert eng.get_display() == "42"
+def test_secondary_display_shows_pending_expression(eng):
+    press_seq(eng, "10+")
+    secondary = eng.get_secondary()
+    assert secondary.startswith("10")
+    assert "+" in secondary
 
 
-def test_basic_division():
-    eng = new_engine()
+def test_division_by_zero_sets_error(eng_in_error):
+    assert eng_in_error.get_display() in {"Erro", "Error"}
 
-    press_seq(eng, ["8", "/", "2", "="])
-    assert eng.get_display() == "4"
 
+@pytest.mark.parametrize(
+    ("keys", "expected"),
+    [("7", ("7", "")), ("C", ("0", ""))],
+    ids=["by_typing_digit", "by_clear"],
+)
+def test_error_recovery(eng_in_error, keys, expected):
+    press_seq(eng_in_error, keys)
+    assert eng_in_error.snapshot() == expected
 
-def test_operator_chain_evaluates_left_to_right():
-    eng = new_engine()
 
-    # 10 + 2 + 3 = 15
-    press_seq(eng, ["1", "0", "+", "2", "+", "3", "="])
-    assert eng.get_display() == "15"
+def test_decimal_precision_01_plus_02(eng):
+    press_seq(eng, "0.1+0.2=")
+    assert eng.get_display() == "0.3"
 
 
-def test_equals_after_operator_uses_stored_value_as_rhs():
-    eng = new_engine()
+def test_input_overflow_is_ignored_not_error(eng):
+    press_seq(eng, "C")
+    for _ in range(200):
+        press(eng, "9")
 
-    # 5 + = => 10 (usa 5 como segundo operando)
-    press_seq(eng, ["5", "+", "="])
-    assert eng.get_display() == "10"
+    display = eng.get_display()
+    assert display != "Overflow"
+    assert len(display) <= eng.MAX_DISPLAY_LEN
 
 
-def test_secondary_display_shows_pending_expression():
-    eng = new_engine()
+def test_press_digits_stops_at_display_limit(eng):
+    eng.press_digits("9" * 200)
+    assert eng.get_display() == "9" * eng.MAX_DISPLAY_LEN
+    assert not eng.error_state
 
-    press_seq(eng, ["1", "0", "+"])
-    assert eng.get_secondary().startswith("10")
-    assert "+" in eng.get_secondary()
 
+def test_press_digits_matches_pressing_each_digit(eng):
+    press_seq(eng, "1+")
+    eng.press_digits("0042")
+    assert eng.get_display() == "42"
 
-def test_division_by_zero_sets_error():
-    eng = new_engine()
+    press_seq(eng, "=")
+    assert eng.get_display() == "43"
 
-    press_seq(eng, ["9", "/", "0", "="])
-    assert eng.get_display() in {"Erro", "Error"}
 
+def test_ce_in_middle_of_operation_12_plus_7_ce_5_equals_17(eng):
+    press_seq(eng, "12+7 CE 5=")
+    assert eng.get_display() == "17"
 
-def test_error_recovery_by_typing_digit():
-    eng = new_engine()
 
-    press_seq(eng, ["9", "/", "0", "="])
-    assert eng.get_display() in {"Erro", "Error"}
+def test_operator_replacement_without_second_operand(eng):
+    press_seq(eng, "10+-2=")
+    assert eng.get_display() == "8"
 
-    press_seq(eng, ["7"])
-    assert eng.get_display() == "7"
 
+@pytest.mark.parametrize(
+    ("keys", "expected"),
+    [("==", "11"), ("1=", "1")],
+    ids=["repeats_last_operation", "disarmed_when_user_starts_new_entry"],
+)
+def test_repeat_equals(eng_after_5_plus_2, keys, expected):
+    press_seq(eng_after_5_plus_2, keys)
+    assert eng_after_5_plus_2.get_display() == expected
 
-def test_error_recovery_by_clear():
-    eng = new_engine()
 
-    press_seq(eng, ["9", "/", "0", "="])
-    press_seq(eng, ["C"])
-    assert eng.get_display() == "0"
-    assert eng.get_secondary() == ""
+def test_version_changes_only_when_key_affects_state(eng):
+    v0 = eng.version
 
+    # "=" sem operação nem memória de repetição não altera nada
+    press_seq(eng, "=")
+    assert eng.version == v0
 
-def test_decimal_precision_01_plus_02():
-    eng = new_engine()
+    press_seq(eng, "5")
+    assert eng.version > v0
 
-    press_seq(eng, ["0", ".", "1", "+", "0", ".", "2", "="])
-    assert eng.get_display() == "0.3"
 
+def test_snapshot_matches_display_and_secondary(eng):
+    press_seq(eng, "12+3")
+    assert eng.snapshot() == (eng.get_display(), eng.get_secondary())
 
-def test_input_overflow_is_ignored_not_error():
-    eng = new_engine()
 
-    press_seq(eng, ["C"])
-    for _ in range(200):
-        press(eng, "9")
+def test_signed_fraction_entry_is_used_in_calculation(eng):
+    # 0. -> ± -> -0. -> ± -> 0. -> 05 => 0.05
+    press_seq(eng, "0.±±05+1=")
+    assert eng.get_display() == "1.05"
 
-    assert eng.get_display() != "Overflow"
-    assert len(eng.get_display()) <= eng.MAX_DISPLAY_LEN
+    press_seq(eng, "C 12.5±*2=")
+    assert eng.get_display() == "-25"
 
 
-def test_ce_in_middle_of_operation_12_plus_7_ce_5_equals_17():
-    eng = new_engine()
-    press_seq(eng, ["1", "2", "+", "7", "CE", "5", "="])
-    assert eng.get_display() == "17"
+def test_press_digit_ignores_non_ascii_digits_and_invalid_input(eng):
+    eng.press_digit("²")
+    eng.press_digit("12")
+    eng.press_digit(5)
+    assert eng.get_display() == "0"
 
 
-def test_operator_replacement_without_second_operand():
-    eng = new_engine()
-    press_seq(eng, ["1", "0", "+", "-", "2", "="])
-    assert eng.get_display() == "8"
+def test_engine_precision_does_not_depend_on_global_decimal_context(eng):
+    with localcontext() as ctx:
+        ctx.prec = 5
+        press_seq(eng, "1/3=")
 
+    assert eng.get_display() == "0." + "3" * 28
 
-def test_repeat_equals_repeats_last_operation():
-    eng = new_engine()
-    press_seq(eng, ["5", "+", "2", "=", "=", "="])
-    assert eng.get_display() == "11"
 
+def test_result_too_large_sets_overflow_and_recovers(eng):
+    press_seq(eng, "9" * 32 + "*=")
+    assert eng.snapshot() == ("Overflow", "")
 
-def test_repeat_equals_is_disarmed_when_user_starts_new_entry():
-    eng = new_engine()
-    press_seq(eng, ["5", "+", "2", "=", "1", "="])
-    assert eng.get_display() == "1"
\ No newline at end of file
+    press_seq(eng, "7")
+    assert eng.get_display() == "7"